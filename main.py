@@ -1,10 +1,66 @@
 import csv
+import functools
+import io
+import mmap
 import os
-from datetime import datetime
-import matplotlib.pyplot as plt
-import pandas as pd
+from dataclasses import dataclass
+from datetime import date as _date
+import numpy as np
+
+# pandas and matplotlib are imported inside the functions that need them:
+# they cost hundreds of milliseconds at startup, and menu sessions that
+# only add or list expenses never pay for them.
 
 FILE_NAME = "expenses.csv"
+PARQUET_NAME = "expenses.parquet"
+
+# Optional fast str->float parser for the non-pandas paths; the bulk CSV
+# load already gets a fast float path inside pandas' tokenizer.
+try:
+    from fastnumbers import fast_float
+
+    def _to_float(s):
+        return fast_float(s, raise_on_invalid=True)
+except ImportError:
+    _to_float = float
+
+# Optional compiled filter+sum kernels. Dates arrive as the integer
+# representation of the datetime64 column, so the bounds check is plain
+# integer compares in native code.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+@functools.lru_cache(maxsize=4)
+def _make_sum_kernel(has_start, has_end):
+    # Emit a kernel specialized for which bounds are present: queries
+    # without a start or end date carry no dead per-row branch. One
+    # compile per (has_start, has_end) signature, memoized forever.
+    if njit is None:
+        return None
+    src = ["def _kernel(dates, cents, lo, hi):",
+           "    total = 0",
+           "    for i in range(dates.size):"]
+    if has_start:
+        src.append("        if dates[i] < lo:")
+        src.append("            continue")
+    if has_end:
+        src.append("        if dates[i] > hi:")
+        src.append("            continue")
+    src.append("        total += cents[i]")
+    src.append("    return total")
+    namespace = {}
+    exec("\n".join(src), namespace)
+    return njit(namespace["_kernel"])
+
+# Parsed-file cache keyed on (mtime_ns, size) so repeated menu actions
+# reuse the previous parse while any external edit still invalidates it.
+_CACHE = {}
+
+def _file_key():
+    st = os.stat(FILE_NAME)
+    return (st.st_mtime_ns, st.st_size)
 
 # -------------------------------
 # Utility functions
@@ -15,93 +71,340 @@ def init_file():
             writer = csv.writer(f)
             writer.writerow(["date", "category", "amount", "description"])
 
+def _invalidate_after_append():
+    # Drop only the DataFrame cache: read_expenses keeps its cached rows
+    # and picks up the appended lines incrementally.
+    _CACHE.pop("df_key", None)
+    _CACHE.pop("df", None)
+    _CACHE.pop("rows_key", None)
+
 def add_expense(date, category, amount, description=""):
     with open(FILE_NAME, "a", newline="") as f:
         writer = csv.writer(f)
         writer.writerow([date, category, amount, description])
+    _invalidate_after_append()
+
+def add_expenses_bulk(rows):
+    # Batch append: one open, one writer, and a large buffer for the
+    # whole batch instead of an open/flush per row.
+    init_file()
+    with open(FILE_NAME, "a", newline="", buffering=1 << 20) as f:
+        csv.writer(f).writerows(rows)
+    _invalidate_after_append()
+
+@dataclass
+class Expenses:
+    # Struct-of-arrays layout: four parallel columns instead of one dict
+    # per row, so scans touch compact arrays rather than millions of
+    # small Python objects.
+    dates: np.ndarray
+    categories: np.ndarray
+    amounts: np.ndarray
+    notes: np.ndarray
+
+    def __len__(self):
+        return len(self.dates)
+
+def _empty_expenses():
+    return Expenses(np.empty(0, dtype=object), np.empty(0, dtype=object),
+                    np.empty(0, dtype=np.float64), np.empty(0, dtype=object))
 
 def read_expenses():
-    rows = []
-    if os.path.exists(FILE_NAME):
-        with open(FILE_NAME, "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                rows.append(row)
-    return rows
-
-def print_table(rows):
-    if not rows:
+    if not os.path.exists(FILE_NAME):
+        return _empty_expenses()
+    key = _file_key()
+    if _CACHE.get("rows_key") == key:
+        return _CACHE["rows"]
+    cols = ([], [], [], [])
+    offset = 0
+    if "raw_cols" in _CACHE and key[1] >= _CACHE["rows_offset"]:
+        # The file only grew (appends): reuse the parsed columns and scan
+        # just the new bytes. A shrunken file forces a full re-parse.
+        cols = _CACHE["raw_cols"]
+        offset = _CACHE["rows_offset"]
+    # Map the file instead of reading through buffered IO: repeated scans
+    # are served straight from the kernel page cache and only the
+    # unparsed tail is touched.
+    with open(FILE_NAME, "rb") as f:
+        new_offset = os.fstat(f.fileno()).st_size
+        if new_offset > offset:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                tail = mm[offset:new_offset]
+        else:
+            tail = b""
+    # Positional csv.reader: no per-row dict construction or key hashing.
+    reader = csv.reader(io.StringIO(tail.decode("utf-8")))
+    if offset == 0:
+        next(reader, None)  # header
+    dates, categories, amounts, notes = cols
+    for r in reader:
+        if not r:
+            continue
+        dates.append(r[0])
+        categories.append(r[1])
+        amounts.append(_to_float(r[2]))
+        notes.append(r[3] if len(r) > 3 else "")
+    expenses = Expenses(np.asarray(dates, dtype=object),
+                        np.asarray(categories, dtype=object),
+                        np.asarray(amounts, dtype=np.float64),
+                        np.asarray(notes, dtype=object))
+    _CACHE["rows_key"] = key
+    _CACHE["rows"] = expenses
+    _CACHE["raw_cols"] = cols
+    _CACHE["rows_offset"] = new_offset
+    return expenses
+
+def _load_df(cols=None):
+    # Single-shot parse through pandas' C tokenizer: amounts come back as
+    # float64 and dates as datetime64, so aggregations never touch
+    # per-row float()/strptime in Python. cols limits the parse to the
+    # columns an operation actually needs (projection pushdown); frames
+    # are cached per column set and per file version.
+    import pandas as pd
+    if not os.path.exists(FILE_NAME):
+        empty = {"date": pd.Series(dtype="datetime64[ns]"),
+                 "category": pd.Series(dtype=str),
+                 "amount": pd.Series(dtype="float64"),
+                 "description": pd.Series(dtype=str)}
+        return pd.DataFrame({c: empty[c] for c in (cols or empty)})
+    key = _file_key()
+    if _CACHE.get("df_key") != key:
+        _CACHE["df"] = {}
+        _CACHE["df_key"] = key
+    frames = _CACHE["df"]
+    if cols not in frames:
+        frames[cols] = _read_table(cols)
+    return frames[cols]
+
+def _read_table(cols):
+    import pandas as pd
+    # Prefer the Parquet sidecar when it is at least as new as the CSV:
+    # typed columnar pages load with zero text parsing and only the
+    # requested columns leave disk. A stale or missing sidecar falls back
+    # to the CSV parse.
+    if (os.path.exists(PARQUET_NAME)
+            and os.path.getmtime(PARQUET_NAME) >= os.path.getmtime(FILE_NAME)):
+        try:
+            return pd.read_parquet(PARQUET_NAME, columns=list(cols) if cols else None)
+        except ImportError:
+            pass
+    df = pd.read_csv(FILE_NAME, dtype={"amount": "float64"},
+                     parse_dates=["date"],
+                     usecols=list(cols) if cols else None)
+    # parse_dates leaves a zero-row column as object dtype (header-only
+    # file); coerce so every consumer sees datetime64 regardless of row
+    # count, matching the missing-file frame in _load_df.
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+def migrate_to_parquet(path=PARQUET_NAME):
+    df = _load_df()
+    if df.empty:
+        print("No data to migrate.")
+        return
+    try:
+        df.to_parquet(path, index=False)
+    except ImportError:
+        print("pyarrow is required for Parquet support.")
+        return
+    print(f"Wrote {len(df)} rows to {path}")
+
+def _load_sorted():
+    # Sorted-by-date view of the cached DataFrame. Entries are normally
+    # appended in date order, so the stable sort is close to a no-op, and
+    # range queries become a searchsorted window instead of a full scan.
+    df = _load_df(("date", "category", "amount"))
+    key = _CACHE.get("df_key")
+    if "sorted_df" not in _CACHE or _CACHE.get("sorted_key") != key:
+        _CACHE["sorted_df"] = df.sort_values("date", kind="stable", ignore_index=True)
+        _CACHE["sorted_key"] = key
+    return _CACHE["sorted_df"]
+
+def _load_columns():
+    # Materialize the sorted date/amount columns as ndarrays once per
+    # file version. Amounts are stored as int64 cents: integer adds are
+    # exact for money (no float rounding drift) and sum as one vectorized
+    # reduction.
+    df = _load_sorted()
+    key = _CACHE.get("sorted_key")
+    if "col_cents" not in _CACHE or _CACHE.get("col_key") != key:
+        _CACHE["col_dates"] = df["date"].to_numpy()
+        _CACHE["col_cents"] = np.rint(
+            df["amount"].to_numpy(dtype=np.float64) * 100).astype(np.int64)
+        _CACHE["col_key"] = key
+    return _CACHE["col_dates"], _CACHE["col_cents"]
+
+def _load_category_codes():
+    # Dictionary-encode the low-cardinality category column once per file
+    # version: an int code per row plus the name table. Group-sums then
+    # become a single bincount pass with no hashing.
+    import pandas as pd
+    df = _load_sorted()
+    key = _CACHE.get("sorted_key")
+    if "cat_codes" not in _CACHE or _CACHE.get("cat_key") != key:
+        codes, cats = pd.factorize(df["category"])
+        _CACHE["cat_codes"] = codes
+        _CACHE["cat_names"] = np.asarray(cats, dtype=object)
+        _CACHE["cat_key"] = key
+    return _CACHE["cat_codes"], _CACHE["cat_names"]
+
+def _date_window(dates, start=None, end=None):
+    # O(log N) bounds on a sorted datetime64 column.
+    lo = np.searchsorted(dates, np.datetime64(start), side="left") if start else 0
+    hi = np.searchsorted(dates, np.datetime64(end), side="right") if end else len(dates)
+    return lo, hi
+
+def print_table(expenses):
+    if not len(expenses):
         print("No expenses found.")
         return
     print("-" * 60)
-    for row in rows:
-        print(f"{row['date']:12} {row['category']:10} {row['amount']:10} {row['description']}")
+    for date, category, amount, note in zip(expenses.dates, expenses.categories,
+                                            expenses.amounts, expenses.notes):
+        print(f"{date:12} {category:10} {amount:10.2f} {note}")
     print("-" * 60)
 
+def _date_mask(dates, start=None, end=None):
+    # Boolean mask over a datetime64 column: one C loop per bound instead
+    # of a Python comparison per row.
+    mask = np.ones(len(dates), dtype=bool)
+    if start:
+        mask &= dates >= np.datetime64(start)
+    if end:
+        mask &= dates <= np.datetime64(end)
+    return mask
+
+class Query:
+    # Minimal lazy query over the cached expense columns: filter/groupby/
+    # sum only record what was asked for, and collect() runs the whole
+    # plan as one fused pass (searchsorted window, then a single
+    # reduction) instead of separate filter/group/sum scans.
+    def __init__(self):
+        self._start = None
+        self._end = None
+        self._group = None
+
+    def filter(self, start=None, end=None):
+        self._start = start
+        self._end = end
+        return self
+
+    def groupby(self, col):
+        if col != "category":
+            raise ValueError(f"can only group by 'category', not {col!r}")
+        self._group = col
+        return self
+
+    def sum(self, col="amount"):
+        if col != "amount":
+            raise ValueError(f"can only sum 'amount', not {col!r}")
+        return self
+
+    def collect(self):
+        dates, cents = _load_columns()
+        if self._group is None:
+            kernel = _make_sum_kernel(bool(self._start), bool(self._end))
+            if kernel is not None and dates.dtype.kind == "M":
+                # Only dispatch when the column is really datetime64; an
+                # empty or untyped column falls through to _date_window,
+                # which handles it.
+                # Bounds in the column's own datetime64 unit; an absent
+                # bound is compiled out of the kernel entirely.
+                lo = np.datetime64(self._start).astype(dates.dtype).astype(np.int64) \
+                    if self._start else 0
+                hi = np.datetime64(self._end).astype(dates.dtype).astype(np.int64) \
+                    if self._end else 0
+                return kernel(dates.view(np.int64), cents, lo, hi) / 100.0
+            lo, hi = _date_window(dates, self._start, self._end)
+            return int(cents[lo:hi].sum()) / 100.0
+        codes, cats = _load_category_codes()
+        lo, hi = _date_window(dates, self._start, self._end)
+        window = codes[lo:hi]
+        counts = np.bincount(window, minlength=len(cats))
+        totals = np.bincount(window, weights=cents[lo:hi], minlength=len(cats))
+        order = np.argsort(totals, kind="stable")[::-1]
+        return {cats[i]: float(totals[i]) / 100.0 for i in order if counts[i]}
+
 def total_expenses(start=None, end=None):
-    rows = read_expenses()
+    return Query().filter(start, end).sum().collect()
+
+def summary_by_category(start=None, end=None):
+    return Query().filter(start, end).groupby("category").sum().collect()
+
+def total_expenses_streaming(start=None, end=None, chunksize=200_000):
+    # Chunked variant for files too large to parse into memory at once:
+    # peak memory is O(chunksize) instead of O(N). Dates stay as ISO
+    # strings, so the range compare needs no parsing.
+    import pandas as pd
+    if not os.path.exists(FILE_NAME):
+        return 0.0
     total = 0.0
-    for row in rows:
-        date = datetime.strptime(row["date"], "%Y-%m-%d")
-        if start and date < datetime.strptime(start, "%Y-%m-%d"):
-            continue
-        if end and date > datetime.strptime(end, "%Y-%m-%d"):
-            continue
-        total += float(row["amount"])
+    for chunk in pd.read_csv(FILE_NAME, chunksize=chunksize,
+                             usecols=["date", "amount"],
+                             dtype={"amount": "float64"}):
+        mask = np.ones(len(chunk), dtype=bool)
+        if start:
+            mask &= chunk["date"].to_numpy() >= start
+        if end:
+            mask &= chunk["date"].to_numpy() <= end
+        total += float(chunk["amount"].to_numpy()[mask].sum())
     return total
 
-def summary_by_category(start=None, end=None):
-    rows = read_expenses()
-    summary = {}
-    for row in rows:
-        date = datetime.strptime(row["date"], "%Y-%m-%d")
-        if start and date < datetime.strptime(start, "%Y-%m-%d"):
-            continue
-        if end and date > datetime.strptime(end, "%Y-%m-%d"):
-            continue
-        cat = row["category"]
-        summary[cat] = summary.get(cat, 0) + float(row["amount"])
-    return summary
+def summary_by_category_streaming(start=None, end=None, chunksize=200_000):
+    # Chunked counterpart of summary_by_category; per-chunk group-sums
+    # are merged into one running dict.
+    import pandas as pd
+    if not os.path.exists(FILE_NAME):
+        return {}
+    parts = []
+    for chunk in pd.read_csv(FILE_NAME, chunksize=chunksize,
+                             usecols=["date", "category", "amount"],
+                             dtype={"amount": "float64"}):
+        mask = np.ones(len(chunk), dtype=bool)
+        if start:
+            mask &= chunk["date"].to_numpy() >= start
+        if end:
+            mask &= chunk["date"].to_numpy() <= end
+        parts.append(chunk.loc[mask].groupby("category", sort=False)["amount"].sum())
+    if not parts:
+        return {}
+    merged = pd.concat(parts).groupby(level=0, sort=False).sum()
+    return merged.sort_values(ascending=False).to_dict()
 
 def export_csv(path="expenses_export.csv"):
-    rows = read_expenses()
-    if not rows:
+    expenses = read_expenses()
+    if not len(expenses):
         print("No data to export.")
         return
     with open(path, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=["date", "category", "amount", "description"])
-        writer.writeheader()
-        writer.writerows(rows)
-    print(f"Exported {len(rows)} rows to {path}")
+        writer = csv.writer(f)
+        writer.writerow(["date", "category", "amount", "description"])
+        writer.writerows(zip(expenses.dates, expenses.categories,
+                             expenses.amounts, expenses.notes))
+    print(f"Exported {len(expenses)} rows to {path}")
 
 # -------------------------------
 # New Features
 # -------------------------------
 def export_excel(path="expenses.xlsx"):
-    rows = read_expenses()
-    if not rows:
+    df = _load_df()
+    if df.empty:
         print("No data to export.")
         return
-    df = pd.DataFrame(rows)
-    df["amount"] = df["amount"].astype(float)
     df.to_excel(path, index=False)
     print(f"Exported {len(df)} rows to {path}")
 
 def plot_summary(start=None, end=None, kind="bar"):
-    rows = read_expenses()
-    if not rows:
+    import matplotlib.pyplot as plt
+
+    df = _load_df(("date", "category", "amount"))
+    if df.empty:
         print("No data to plot.")
         return
-    
-    df = pd.DataFrame(rows)
-    df["amount"] = df["amount"].astype(float)
-    df["date"] = pd.to_datetime(df["date"])
 
-    # Apply filters
-    if start:
-        df = df[df["date"] >= pd.to_datetime(start)]
-    if end:
-        df = df[df["date"] <= pd.to_datetime(end)]
+    # Dates are already datetime64 from the cached parse; filtering is a
+    # vectorized compare, no per-call to_datetime.
+    df = df.loc[_date_mask(df["date"].to_numpy(), start, end)]
 
     if df.empty:
         print("No data in given range.")
@@ -141,6 +444,29 @@ def plot_summary(start=None, end=None, kind="bar"):
     plt.tight_layout()
     plt.show()
 
+def input_date(prompt="Date (YYYY-MM-DD): "):
+    # Loop rather than recurse on bad input: constant stack no matter
+    # how many retries.
+    while True:
+        s = input(prompt).strip()
+        try:
+            _date.fromisoformat(s)
+            return s
+        except ValueError:
+            print("Enter a valid date in YYYY-MM-DD format.")
+
+def input_amount(prompt="Amount: "):
+    while True:
+        s = input(prompt).strip()
+        try:
+            amount = _to_float(s)
+        except ValueError:
+            print("Enter a valid number.")
+            continue
+        if amount >= 0:
+            return amount
+        print("Amount must be non-negative.")
+
 # -------------------------------
 # Main Menu
 # -------------------------------
@@ -156,13 +482,14 @@ def main():
         print("6. Exit")
         print("7. Plot summary (bar/pie/line/stacked)")
         print("8. Export to Excel (xlsx)")
+        print("9. Migrate to Parquet (faster loads)")
         choice = input("Choose: ").strip()
 
         if choice == "1":
             try:
-                date = input("Date (YYYY-MM-DD): ").strip()
+                date = input_date()
                 category = input("Category: ").strip()
-                amount = float(input("Amount: ").strip())
+                amount = input_amount()
                 description = input("Description (optional): ").strip()
                 add_expense(date, category, amount, description)
                 print("Expense added successfully!")
@@ -215,6 +542,9 @@ def main():
             path = input("Excel path [expenses.xlsx]: ").strip() or "expenses.xlsx"
             export_excel(path)
 
+        elif choice == "9":
+            migrate_to_parquet()
+
         else:
             print("Invalid choice.")
 